@@ -16,25 +16,36 @@ Il orchestre les différents modules pour :
 """
 
 import multiprocessing as mp
+import selectors
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 import cv2
 import numpy as np
 import time
-import readchar
-from time import localtime, sleep, strftime
-from vilib import Vilib
+import sys
+import select
+import tty
+import termios
+from time import sleep, monotonic_ns
 import os
+from concurrent.futures import ThreadPoolExecutor
 from picarx import Picarx
 
 # Importation des modules personnalisés
 from src.vision.camera import CameraModule
 from src.vision.line_detector import LineDetector
 from src.vision.sign_detector import SignDetector
+from src.vision.detection_worker import DetectionWorker, COLORS
 from src.control.motor_control import MotorController
 from src.control.navigator import Navigator
-from src.utils.config import Configuration
+from src.utils.config import get_config
 from src.control.robot_controller import RobotController
+from src.control.ultrasonic import UltrasonicMonitor
+from src.control.line_status_jit import (
+    get_status_nb, LineStatusFilter, LineState
+)
+from src.utils.ipc import SPSCRing, FRAME_DTYPE, encode_vision
 
 # Constantes optimisées
 LINE_TRACK_SPEED = 10
@@ -42,87 +53,118 @@ LINE_TRACK_ANGLE_OFFSET = 20
 AVOID_OBSTACLES_SPEED = 40
 SafeDistance = 40   # > 40 safe
 DangerDistance = 20 # > 20 && < 40 turn around, < 20 backward
-
-def get_status(px, val_list):
-    """Détection de ligne optimisée"""
-    _state = px.get_line_status(val_list)
-    if _state == [0, 0, 0]:
-        return 'stop'
-    elif _state[1] == 1:
-        return 'forward'
-    elif _state[0] == 1:
-        return 'right'
-    elif _state[2] == 1:
-        return 'left'
+VISION_RING_CAPACITY = 16  # Puissance de deux (modulo par masque)
+OBSTACLE_CHECK_INTERVAL = 3  # Ticks entre deux vérifications d'obstacles
+NAVIGATION_TIMEOUT = 0.01  # Réveil maximal de la navigation sans événement
+CONTROL_PERIOD = 0.01  # Période de la boucle de contrôle (100 Hz)
+
+# Répartition des cœurs (le processus principal reste sur le CPU 0)
+VISION_CPUS = {2, 3}
+NAVIGATION_CPUS = {1}
+NAVIGATION_NICE = -5
+NAVIGATION_RT_PRIORITY = 20  # Priorité SCHED_FIFO
+
+# Détecteurs de ligne et de panneaux exécutés en parallèle (un par cœur
+# de VISION_CPUS) : OpenCV libère le GIL pendant ses calculs.
+# Les threads ne sont créés qu'à la première soumission, donc dans
+# le processus de vision.
+_DETECTION_POOL = ThreadPoolExecutor(max_workers=len(VISION_CPUS))
+
+# Réaction par zone de distance : (angle, mouvement, durée)
+# 0 : danger (< DangerDistance), 1 : proche, 2 : sûr (>= SafeDistance)
+_ZONE_ACTIONS = (
+    (-30, Picarx.backward, 0.5),
+    (30, Picarx.forward, 0.1),
+    (0, Picarx.forward, 0),
+)
 
 def outHandle(px, last_line_state):
     """Gestion des sorties de ligne"""
-    if last_line_state == 'left':
+    if last_line_state == LineState.LEFT:
         px.set_dir_servo_angle(-30)
         px.backward(10)
-    elif last_line_state == 'right':
+    elif last_line_state == LineState.RIGHT:
         px.set_dir_servo_angle(30)
         px.backward(10)
+
+    # Méthodes liées et tampon résolus une seule fois hors de la boucle
+    _get_gray = px.get_grayscale_data
+    _get_status = px.get_line_status
+    _decode = get_status_nb
+    buf = np.empty(3, dtype=np.int8)
     while True:
-        gm_val_list = px.get_grayscale_data()
-        gm_state = get_status(px, gm_val_list)
-        if gm_state != last_line_state:
+        buf[:] = _get_status(_get_gray())
+        if _decode(buf) != last_line_state:
             break
     sleep(0.001)
 
-def avoid_obstacles(px):
-    """Éviter les obstacles"""
-    try:
-        distance = round(px.ultrasonic.read(), 2)
-        print(f"Distance: {distance} cm")
-        
-        # Vérifier si la distance est valide
-        if distance < 0 or distance > 1000:  # Valeurs invalides
-            print("Erreur de lecture du capteur ultrasonique")
-            return SafeDistance + 1  # Continuer comme si c'était sûr
-        
-        if distance >= SafeDistance:
-            px.set_dir_servo_angle(0)
-            px.forward(AVOID_OBSTACLES_SPEED)
-        elif distance >= DangerDistance:
-            px.set_dir_servo_angle(30)
-            px.forward(AVOID_OBSTACLES_SPEED)
-            sleep(0.1)
+def avoid_obstacles(px, ultrasonic):
+    """Éviter les obstacles (distance lue en cache, sans attente de l'écho)"""
+    distance = ultrasonic.distance
+    zone = 2 if distance >= SafeDistance else (1 if distance >= DangerDistance else 0)
+
+    angle, move, pause = _ZONE_ACTIONS[zone]
+    px.set_dir_servo_angle(angle)
+    move(px, AVOID_OBSTACLES_SPEED)
+    if pause:
+        sleep(pause)
+    return distance
+
+class LineTracker:
+    """
+    Suivi de ligne de la boucle de contrôle.
+    Chemin rapide spécialisé pour le cas courant (voie libre) : la
+    vérification d'obstacles n'est faite qu'un tick sur
+    OBSTACLE_CHECK_INTERVAL, puis à chaque tick tant que la voie
+    n'est pas libre.
+    """
+
+    def __init__(self, px, ultrasonic):
+        """
+        Initialise le suivi de ligne.
+
+        Args:
+            px (Picarx): Instance du robot
+            ultrasonic (UltrasonicMonitor): Distance aux obstacles en cache
+        """
+        self.px = px
+        self.ultrasonic = ultrasonic
+        self.line_filter = LineStatusFilter()
+        self.last_line_state = LineState.FORWARD  # État initial
+        self._tick = 0
+        self._last_safe = True
+
+    def line_track(self):
+        """Suivi de ligne optimisé (état de ligne filtré par vote majoritaire)"""
+        self._tick += 1
+        if not self._last_safe or self._tick % OBSTACLE_CHECK_INTERVAL == 0:
+            self._line_track_with_obstacle_check()
+            if not self._last_safe:
+                return
+
+        # Suivi de ligne
+        px = self.px
+        gm_val_list = px.get_grayscale_data()
+        gm_state = self.line_filter.get_status(px, gm_val_list)
+
+        if gm_state != LineState.STOP:
+            self.last_line_state = gm_state
+            if gm_state == LineState.FORWARD:
+                px.set_dir_servo_angle(0)
+                px.forward(LINE_TRACK_SPEED)
+            elif gm_state == LineState.LEFT:
+                px.set_dir_servo_angle(LINE_TRACK_ANGLE_OFFSET)
+                px.forward(LINE_TRACK_SPEED)
+            elif gm_state == LineState.RIGHT:
+                px.set_dir_servo_angle(-LINE_TRACK_ANGLE_OFFSET)
+                px.forward(LINE_TRACK_SPEED)
         else:
-            px.set_dir_servo_angle(-30)
-            px.backward(AVOID_OBSTACLES_SPEED)
-            sleep(0.5)
-        return distance
-    except Exception as e:
-        print(f"Erreur lors de la lecture du capteur: {e}")
-        return SafeDistance + 1  # Continuer comme si c'était sûr
-
-def line_track(px, last_line_state):
-    """Suivi de ligne optimisé"""
-    # Vérifier d'abord les obstacles
-    distance = avoid_obstacles(px)
-    if distance < SafeDistance:
-        return last_line_state
-
-    # Suivi de ligne
-    gm_val_list = px.get_grayscale_data()
-    gm_state = get_status(px, gm_val_list)
-
-    if gm_state != "stop":
-        last_line_state = gm_state
-        if gm_state == 'forward':
-            px.set_dir_servo_angle(0)
-            px.forward(LINE_TRACK_SPEED)
-        elif gm_state == 'left':
-            px.set_dir_servo_angle(LINE_TRACK_ANGLE_OFFSET)
-            px.forward(LINE_TRACK_SPEED)
-        elif gm_state == 'right':
-            px.set_dir_servo_angle(-LINE_TRACK_ANGLE_OFFSET)
-            px.forward(LINE_TRACK_SPEED)
-    else:
-        outHandle(px, last_line_state)
-    
-    return last_line_state
+            outHandle(px, self.last_line_state)
+
+    def _line_track_with_obstacle_check(self):
+        """Chemin lent : évitement d'obstacles et mise à jour de l'état sûr"""
+        distance = avoid_obstacles(self.px, self.ultrasonic)
+        self._last_safe = distance >= SafeDistance
 
 class PiCarXController:
     """
@@ -130,51 +172,108 @@ class PiCarXController:
     Gère l'ensemble du système et coordonne les différents modules.
     """
 
-    def __init__(self):
+    def __init__(self, log_level=logging.INFO):
         """
         Initialise le contrôleur avec tous ses composants.
         Configure le logging et établit les connexions entre les modules.
+
+        Args:
+            log_level (int): Niveau du logger 'PiCarX'
+                           (logging.WARNING en production)
         """
         # Configuration du système de logging
-        self._setup_logging()
+        self._setup_logging(log_level)
         self.logger.info("Initialisation du contrôleur PiCarX")
         
         # Initialisation des composants principaux
         try:
-            self.config = Configuration()
+            self.config = get_config()
             self.camera = CameraModule()
             self.line_detector = LineDetector()
             self.sign_detector = SignDetector()
-            self.motor_controller = MotorController()
-            self.navigator = Navigator(self.motor_controller)
+            # Instance unique du robot, partagée avec le contrôleur moteur
             self.px = Picarx(ultrasonic_pins=['D2','D3'])  # trig, echo
-            self.last_line_state = 'forward'  # État initial
+            self.motor_controller = MotorController(px=self.px)
+            self.navigator = Navigator(self.motor_controller)
+            self.last_line_state = LineState.FORWARD  # État initial
         except Exception as e:
             self.logger.error(f"Erreur lors de l'initialisation: {str(e)}")
             raise
 
         # Configuration du multiprocessing
-        self.vision_queue = mp.Queue()  # File pour les données de vision
-        self.command_queue = mp.Queue()  # File pour les commandes externes
+        # File circulaire en mémoire partagée pour les données de vision
+        self.vision_ring = SPSCRing(
+            FRAME_DTYPE, VISION_RING_CAPACITY, notify=True
+        )
+        # Canal pour les commandes externes (voir send_command)
+        self._command_reader, self._command_writer = mp.Pipe(duplex=False)
         self.running = mp.Value('b', True)  # Drapeau d'état du système
 
-    def _setup_logging(self):
+    def _setup_logging(self, level=logging.INFO):
         """
         Configure le système de logging avec deux handlers :
         - Un pour les fichiers (conservation de l'historique)
         - Un pour la console (monitoring en temps réel)
+
+        Les processus n'écrivent jamais eux-mêmes : leurs messages passent
+        par une file et un thread d'écoute unique effectue les E/S.
+        La file est multiprocessus pour recueillir aussi les messages
+        des processus de vision et de navigation.
+
+        Args:
+            level (int): Niveau du logger 'PiCarX'
         """
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        file_handler = logging.FileHandler(
+            f'picarx_{datetime.now():%Y%m%d_%H%M%S}.log'
+        )
+        stream_handler = logging.StreamHandler()
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(formatter)
+
+        self.log_queue = mp.Queue(-1)
+        self.log_listener = QueueListener(
+            self.log_queue, file_handler, stream_handler
+        )
         logging.basicConfig(
             level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(
-                    f'picarx_{datetime.now():%Y%m%d_%H%M%S}.log'
-                ),
-                logging.StreamHandler()
-            ]
+            handlers=[QueueHandler(self.log_queue)]
         )
+        self.log_listener.start()
+
         self.logger = logging.getLogger('PiCarX')
+        self.logger.setLevel(level)
+
+    def send_command(self, command):
+        """
+        Transmet une commande externe au processus de navigation.
+
+        Args:
+            command (dict): Commande à exécuter (voir Navigator.handle_command)
+        """
+        self._command_writer.send(command)
+
+    def _pin_process(self, cpus, realtime=False):
+        """
+        Fixe le processus courant sur des cœurs donnés.
+        Les réglages de priorité nécessitent des droits root : en cas
+        d'échec, le processus continue avec la priorité par défaut.
+
+        Args:
+            cpus (set): Cœurs autorisés
+            realtime (bool): Passe le processus en priorité temps réel
+        """
+        try:
+            os.sched_setaffinity(0, cpus)
+            if realtime:
+                os.nice(NAVIGATION_NICE)
+                os.sched_setscheduler(
+                    0, os.SCHED_FIFO, os.sched_param(NAVIGATION_RT_PRIORITY)
+                )
+        except (OSError, AttributeError) as e:
+            self.logger.warning(f"Réglage CPU/priorité impossible: {str(e)}")
 
     def vision_process(self):
         """
@@ -185,6 +284,10 @@ class PiCarXController:
         """
         self.logger.info("Démarrage du processus de vision")
         
+        # OpenCV limité à un thread, sur des cœurs dédiés
+        cv2.setNumThreads(1)
+        self._pin_process(VISION_CPUS)
+        
         while self.running.value:
             try:
                 # Acquisition de l'image
@@ -192,16 +295,21 @@ class PiCarXController:
                 if frame is None:
                     continue
                 
-                # Analyse de l'image
-                line_info = self.line_detector.detect(frame)
-                signs = self.sign_detector.detect(frame)
+                # Analyse de l'image (ligne et panneaux en parallèle)
+                line_future = _DETECTION_POOL.submit(
+                    self.line_detector.detect, frame
+                )
+                signs_future = _DETECTION_POOL.submit(
+                    self.sign_detector.detect, frame
+                )
+                line_info = line_future.result()
+                signs = signs_future.result()
                 
-                # Envoi des résultats
-                self.vision_queue.put({
-                    'line_info': line_info,
-                    'signs': signs,
-                    'timestamp': datetime.now()
-                })
+                # Envoi des résultats, écrits sur place dans la file
+                # (la plus récente écrase la plus ancienne)
+                record = self.vision_ring.reserve()
+                encode_vision(record, line_info, signs, monotonic_ns())
+                self.vision_ring.commit()
             except Exception as e:
                 self.logger.error(f"Erreur dans le processus vision: {str(e)}")
 
@@ -212,27 +320,40 @@ class PiCarXController:
         Gère également les commandes externes reçues.
         """
         self.logger.info("Démarrage du processus de navigation")
+        self._pin_process(NAVIGATION_CPUS, realtime=True)
+        
+        # Réveil sur événement : nouvelle image ou nouvelle commande
+        selector = selectors.DefaultSelector()
+        selector.register(self.vision_ring, selectors.EVENT_READ, 'vision')
+        selector.register(self._command_reader, selectors.EVENT_READ, 'cmd')
+        
+        # Méthodes liées résolues une seule fois hors de la boucle
+        _select = selector.select
+        _clear = self.vision_ring.clear_notification
+        _pop_latest = self.vision_ring.pop_latest
+        _from_vision = self.navigator.update_from_vision
+        _poll = self._command_reader.poll
+        _recv = self._command_reader.recv
+        _handle_command = self.navigator.handle_command
+        _update = self.navigator.update
         
         while self.running.value:
             try:
-                # Traitement des données de vision
-                try:
-                    vision_data = self.vision_queue.get(timeout=0.1)
-                    if vision_data is not None:
-                        self.navigator.update_from_vision(vision_data)
-                except Exception as e:
-                    self.logger.debug(f"Pas de nouvelles données de vision: {str(e)}")
-                
-                # Traitement des commandes externes
-                try:
-                    command = self.command_queue.get_nowait()
-                    if command is not None:
-                        self.navigator.handle_command(command)
-                except:
-                    pass  # Pas de nouvelle commande
+                # Le délai maximal garde les temporisations à jour
+                for key, _ in _select(timeout=NAVIGATION_TIMEOUT):
+                    if key.data == 'vision':
+                        # Seule l'image la plus récente est utile
+                        _clear()
+                        record = _pop_latest()
+                        if record is not None:
+                            _from_vision(record)
+                    else:
+                        # Traitement des commandes externes
+                        while _poll():
+                            _handle_command(_recv())
                 
                 # Mise à jour de la navigation
-                self.navigator.update()
+                _update()
                 
             except Exception as e:
                 self.logger.error(f"Erreur dans le processus navigation: {str(e)}")
@@ -275,16 +396,22 @@ class PiCarXController:
             self.camera.release()
             self.motor_controller.stop()
             self.px.stop()
+            self.vision_ring.close()
         except Exception as e:
             self.logger.error(f"Erreur lors du nettoyage: {str(e)}")
+        finally:
+            # Vide la file de logging avant de quitter
+            self.log_listener.stop()
 
 def main():
-    # Initialisation de la caméra et du robot
-    Vilib.camera_start(vflip=False, hflip=False)
-    Vilib.display(local=True, web=True)
+    # Caméra, affichage et détections Vilib dans un processus dédié
+    detection = DetectionWorker()
+    detection.start()
     
     # Initialisation du robot avec les pins du capteur ultrasonique
     px = Picarx(ultrasonic_pins=['D2','D3'])  # trig, echo
+    ultrasonic = UltrasonicMonitor(px)
+    ultrasonic.start()
     
     print("""
     Commandes:
@@ -302,39 +429,42 @@ def main():
     x: Quitter
     """)
 
-    colors = ['close', 'red', 'orange', 'yellow', 'green', 'blue', 'purple']
     face_active = False
     color_active = False
     line_following_active = False
-    last_line_state = 'forward'  # État initial
+    tracker = LineTracker(px, ultrasonic)
+
+    # Clavier en mode non canonique : lecture sans attendre Entrée
+    stdin_fd = sys.stdin.fileno()
+    old_term_attrs = termios.tcgetattr(stdin_fd)
+    tty.setcbreak(stdin_fd)
 
     try:
         while True:
-            key = readchar.readkey().lower()
+            # Lecture non bloquante d'une touche éventuelle
+            ready, _, _ = select.select([sys.stdin], [], [], 0)
+            key = None
+            if ready:
+                key = os.read(stdin_fd, 1).decode(errors='replace').lower()
 
             if key == 'x':
                 break
 
             elif key == 'q':
                 # Prendre une photo
-                timestamp = strftime('%Y-%m-%d-%H-%M-%S', localtime(time()))
-                name = f'photo_{timestamp}'
-                username = os.getlogin()
-                path = f"/home/{username}/Pictures/"
-                Vilib.take_photo(name, path)
-                print(f'Photo sauvegardée: {path}{name}.jpg')
-
-            elif key in '0123456':
+                detection.take_photo()
+
+            elif key is not None and key in '0123456':
                 # Détection de couleur
                 index = int(key)
                 color_active = (index != 0)
-                Vilib.color_detect(colors[index])
-                print(f'Détection couleur: {colors[index]}')
+                detection.color_detect(index)
+                print(f'Détection couleur: {COLORS[index]}')
 
             elif key == 'f':
                 # Détection de visages
                 face_active = not face_active
-                Vilib.face_detect_switch(face_active)
+                detection.face_detect(face_active)
                 print(f'Détection visages: {"activée" if face_active else "désactivée"}')
 
             elif key == 'l':
@@ -348,37 +478,36 @@ def main():
 
             elif key == 's':
                 # Afficher les informations détectées
+                info = detection.latest_detection()
                 if color_active:
-                    if Vilib.detect_obj_parameter['color_n'] > 0:
-                        pos = (Vilib.detect_obj_parameter['color_x'],
-                              Vilib.detect_obj_parameter['color_y'])
-                        size = (Vilib.detect_obj_parameter['color_w'],
-                               Vilib.detect_obj_parameter['color_h'])
+                    if info['color_n'] > 0:
+                        pos = (info['color_x'], info['color_y'])
+                        size = (info['color_w'], info['color_h'])
                         print(f"Couleur détectée - Position: {pos}, Taille: {size}")
                     else:
                         print("Aucune couleur détectée")
 
                 if face_active:
-                    if Vilib.detect_obj_parameter['human_n'] > 0:
-                        pos = (Vilib.detect_obj_parameter['human_x'],
-                              Vilib.detect_obj_parameter['human_y'])
-                        size = (Vilib.detect_obj_parameter['human_w'],
-                               Vilib.detect_obj_parameter['human_h'])
+                    if info['human_n'] > 0:
+                        pos = (info['human_x'], info['human_y'])
+                        size = (info['human_w'], info['human_h'])
                         print(f"Visage détecté - Position: {pos}, Taille: {size}")
                     else:
                         print("Aucun visage détecté")
 
-            # Exécuter le suivi de ligne si actif
+            # Exécuter le suivi de ligne si actif, indépendamment du clavier
             if line_following_active:
-                last_line_state = line_track(px, last_line_state)
+                tracker.line_track()
 
-            sleep(0.1)
+            sleep(CONTROL_PERIOD)
 
     except KeyboardInterrupt:
         print("\nArrêt demandé par l'utilisateur")
     finally:
+        termios.tcsetattr(stdin_fd, termios.TCSADRAIN, old_term_attrs)
+        ultrasonic.stop()
         px.stop()
-        Vilib.camera_close()
+        detection.stop()
         print("Programme terminé")
 
 if __name__ == "__main__":
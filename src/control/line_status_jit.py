@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module d'État de Ligne Compilé
+----------------------------
+Décode l'état des trois capteurs de niveaux de gris en un code entier.
+Compilé avec Numba : appelé à chaque tick de la boucle de suivi.
+"""
+
+from enum import IntEnum
+
+import numpy as np
+from numba import njit, int8
+
+class LineState(IntEnum):
+    """États possibles de la ligne sous les capteurs."""
+    STOP = 0
+    FORWARD = 1
+    RIGHT = 2
+    LEFT = 3
+
+# Codes entiers bruts, constants à la compilation pour Numba
+_STOP = int(LineState.STOP)
+_FORWARD = int(LineState.FORWARD)
+_RIGHT = int(LineState.RIGHT)
+_LEFT = int(LineState.LEFT)
+
+
+@njit(int8(int8[::1]), cache=True, boundscheck=False)
+def get_status_nb(s):
+    """
+    Décode l'état de ligne.
+
+    Args:
+        s (np.array): État des capteurs [gauche, centre, droite] (int8)
+
+    Returns:
+        int: Code d'état (valeur de LineState)
+    """
+    if s[1] == 1:
+        return _FORWARD
+    elif s[0] == 1:
+        return _RIGHT
+    elif s[2] == 1:
+        return _LEFT
+    return _STOP
+
+
+class LineStatusFilter:
+    """
+    Filtre de l'état de ligne par vote majoritaire.
+    Conserve les dernières lectures des capteurs et ne retient,
+    pour chaque canal, que la valeur vue sur au moins la moitié d'entre elles.
+    """
+
+    def __init__(self, depth=4):
+        """
+        Initialise le filtre.
+
+        Args:
+            depth (int): Nombre de lectures conservées (puissance de deux)
+        """
+        if depth <= 0 or depth & (depth - 1):
+            raise ValueError("La profondeur doit être une puissance de deux")
+        self._hist = np.zeros((depth, 3), dtype=np.int8)
+        self._mask = depth - 1
+        self._quorum = depth // 2
+        self._index = 0
+
+    def get_status(self, px, val_list):
+        """
+        Ajoute une lecture et retourne l'état de ligne filtré.
+
+        Args:
+            px (Picarx): Instance du robot
+            val_list (list): Données brutes des capteurs de niveaux de gris
+
+        Returns:
+            int: Code d'état (valeur de LineState)
+        """
+        state = px.get_line_status(val_list)
+        if self._index == 0:
+            # Première lecture : historique initialisé sans biais vers STOP
+            self._hist[:] = state
+        else:
+            self._hist[self._index & self._mask] = state
+        self._index += 1
+
+        vote = (self._hist.sum(axis=0) >= self._quorum).astype(np.int8)
+        return get_status_nb(vote)
@@ -9,26 +9,49 @@ de haut niveau pour le contrôle du mouvement.
 
 import time
 import logging
+import numpy as np
 from picarx import Picarx
 
+# Décélération progressive à l'arrêt
+STOP_DECAY = 0.8  # Facteur de réduction par palier
+STOP_MIN_SPEED = 5  # Vitesse en dessous de laquelle on coupe les moteurs
+STOP_STEP_PERIOD = 0.05  # Durée d'un palier en secondes
+
+def _sleep_until(deadline):
+    """
+    Attend jusqu'à une échéance de time.monotonic().
+
+    Args:
+        deadline (float): Échéance en secondes
+    """
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
+
 class MotorController:
     """
     Contrôleur des moteurs du PiCarX.
     Gère les mouvements de base et les ajustements fins.
     """
 
-    def __init__(self):
+    def __init__(self, px=None):
         """
         Initialise le contrôleur de moteurs.
         Configure les paramètres de base et les limites de sécurité.
+
+        Args:
+            px (Picarx): Instance du robot à partager (créée si absente)
         """
         self.logger = logging.getLogger('PiCarX.MotorController')
         
         try:
-            self.px = Picarx()
+            self.px = px if px is not None else Picarx()
+            # Écriture moteur résolue une fois, dernières vitesses écrites
+            self._set_motor = self.px.set_motor_speed
+            self._motor_speeds = [None, None]
+            
             # Arrêt initial des deux moteurs
-            self.px.set_motor_speed(1, 0)  # Moteur gauche
-            self.px.set_motor_speed(2, 0)  # Moteur droit
+            self._write_dual(0, 0)
             
             # Paramètres de contrôle
             self.max_speed = 50  # Vitesse maximale (0-100)
@@ -53,25 +76,45 @@ class MotorController:
             speed (float): Vitesse désirée (-100 à 100)
                          Négatif pour marche arrière
         """
+        # Limitation de la vitesse (sans appel à min/max)
+        ms = self.max_speed
+        speed = ms if speed > ms else (-ms if speed < -ms else speed)
+        self._set_speed_unchecked(speed)
+
+    def _set_speed_unchecked(self, speed):
+        """
+        Applique une vitesse déjà bornée aux deux moteurs.
+
+        Args:
+            speed (float): Vitesse dans [-max_speed, max_speed]
+        """
         try:
-            # Limitation de la vitesse
-            speed = max(min(speed, self.max_speed), -self.max_speed)
-            
-            # Application de la vitesse aux deux moteurs
-            if speed >= 0:
-                # Marche avant
-                self.px.set_motor_speed(1, speed)    # Moteur gauche
-                self.px.set_motor_speed(2, -speed)   # Moteur droit (inversé)
-            else:
-                # Marche arrière
-                self.px.set_motor_speed(1, speed)    # Moteur gauche
-                self.px.set_motor_speed(2, -speed)   # Moteur droit (inversé)
+            # Même écriture en marche avant et arrière
+            self._write_dual(speed, -speed)   # Moteur droit inversé
             
             self.current_speed = speed
             
         except Exception as e:
             self.logger.error(f"Erreur lors du réglage de la vitesse: {str(e)}")
 
+    def _write_dual(self, left, right):
+        """
+        Écrit les vitesses des deux moteurs en une seule opération.
+        Un moteur dont la vitesse n'a pas changé n'est pas réécrit,
+        ce qui évite les accès I²C redondants.
+
+        Args:
+            left (float): Vitesse du moteur gauche
+            right (float): Vitesse du moteur droit
+        """
+        speeds = self._motor_speeds
+        if left != speeds[0]:
+            self._set_motor(1, left)
+            speeds[0] = left
+        if right != speeds[1]:
+            self._set_motor(2, right)
+            speeds[1] = right
+
     def set_steering(self, angle):
         """
         Définit l'angle de braquage.
@@ -81,8 +124,9 @@ class MotorController:
                          Négatif pour tourner à gauche
         """
         try:
-            # Limitation de l'angle
-            angle = max(min(angle, self.max_steering), -self.max_steering)
+            # Limitation de l'angle (sans appel à min/max)
+            ma = self.max_steering
+            angle = ma if angle > ma else (-ma if angle < -ma else angle)
             
             # Application de l'angle
             self.px.set_dir_servo_angle(angle)
@@ -92,26 +136,55 @@ class MotorController:
             if self.current_speed != 0:
                 power_scale = (100 - abs(angle)) / 100.0
                 if angle > 0:  # Virage à droite
-                    self.px.set_motor_speed(1, self.current_speed)
-                    self.px.set_motor_speed(2, -self.current_speed * power_scale)
+                    self._write_dual(self.current_speed,
+                                     -self.current_speed * power_scale)
                 else:  # Virage à gauche
-                    self.px.set_motor_speed(1, self.current_speed * power_scale)
-                    self.px.set_motor_speed(2, -self.current_speed)
+                    self._write_dual(self.current_speed * power_scale,
+                                     -self.current_speed)
             
         except Exception as e:
             self.logger.error(f"Erreur lors du braquage: {str(e)}")
 
+    def set_motion(self, angle, speed):
+        """
+        Applique le braquage et la vitesse en un seul appel.
+        Les valeurs doivent être déjà bornées par l'appelant.
+
+        Args:
+            angle (float): Angle de braquage (degrés)
+            speed (float): Vitesse désirée
+        """
+        try:
+            self.px.set_dir_servo_angle(angle)
+            # Roues à vitesse égale, comme set_steering suivi de set_speed
+            self._write_dual(speed, -speed)
+            
+            self.current_steering = angle
+            self.current_speed = speed
+            
+        except Exception as e:
+            self.logger.error(f"Erreur lors du réglage du mouvement: {str(e)}")
+
     def stop(self):
         """Arrête le robot en douceur."""
         try:
-            # Décélération progressive
-            while abs(self.current_speed) > 5:
-                new_speed = self.current_speed * 0.8
-                self.set_speed(new_speed)
-                time.sleep(0.1)
+            # Décélération progressive : paliers géométriques précalculés
+            speed = self.current_speed
+            if abs(speed) > STOP_MIN_SPEED:
+                n_steps = int(np.ceil(
+                    np.log(STOP_MIN_SPEED / abs(speed)) / np.log(STOP_DECAY)
+                ))
+                steps = speed * STOP_DECAY ** np.arange(1, n_steps + 1)
+                
+                deadline = time.monotonic()
+                for step in steps:
+                    self._set_speed_unchecked(float(step))
+                    deadline += STOP_STEP_PERIOD
+                    _sleep_until(deadline)
             
             # Arrêt complet
             self.px.stop()
+            self._motor_speeds = [0, 0]
             self.set_steering(0)
             self.current_speed = 0
             
@@ -124,39 +197,9 @@ class MotorController:
         """Arrêt d'urgence immédiat."""
         try:
             self.px.stop()
+            self._motor_speeds = [0, 0]
             self.current_speed = 0
             self.current_steering = 0
             self.logger.warning("Arrêt d'urgence effectué")
         except Exception as e:
             self.logger.error(f"Échec de l'arrêt d'urgence: {str(e)}")
-
-    def avoid_obstacles(self):
-        """Évitement d'obstacles optimisé"""
-        distance = self.px.get_distance()
-        if distance >= SafeDistance:
-            self.px.set_dir_servo_angle(0)
-            self.px.forward(AVOID_OBSTACLES_SPEED)
-        elif distance >= DangerDistance:
-            self.px.set_dir_servo_angle(30)
-            self.px.forward(AVOID_OBSTACLES_SPEED)
-            time.sleep(0.1)
-        else:
-            self.px.set_dir_servo_angle(-30)
-            self.px.backward(AVOID_OBSTACLES_SPEED)
-            time.sleep(0.5)
-
-    def outHandle(self):
-        """Gestion des sorties de ligne"""
-        global last_line_state
-        if last_line_state == 'left':
-            self.px.set_dir_servo_angle(-30)
-            self.px.backward(10)
-        elif last_line_state == 'right':
-            self.px.set_dir_servo_angle(30)
-            self.px.backward(10)
-        while True:
-            gm_val_list = self.px.get_grayscale_data()
-            gm_state = get_status(gm_val_list)
-            if gm_state != last_line_state:
-                break
-        time.sleep(0.001)
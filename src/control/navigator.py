@@ -9,14 +9,45 @@ les informations de vision et les commandes de contrôle.
 
 import logging
 import time
-from enum import Enum
+from enum import IntEnum
+from numba import njit
+from ..utils.ipc import SIGN_CLASSES
 
-class NavigationState(Enum):
+class NavigationState(IntEnum):
     """États possibles du système de navigation."""
-    SUIVRE_LIGNE = "suivre_ligne"
-    TRAITER_PANNEAU = "traiter_panneau"
-    ATTENTE_COMMANDE = "attente_commande"
-    ARRET = "arret"
+    SUIVRE_LIGNE = 0
+    TRAITER_PANNEAU = 1
+    ATTENTE_COMMANDE = 2
+    ARRET = 3
+    ARRET_TEMPORISE = 4
+
+FRAME_WIDTH = 640  # Largeur supposée de l'image
+
+@njit(cache=True)
+def compute_line_cmd(center_x, half_width, inv_half_width, steer_gain,
+                     base_speed, min_speed, max_steering):
+    """
+    Calcule en une passe les commandes de suivi de ligne.
+    Les constantes dérivées de la largeur d'image sont précalculées
+    par l'appelant (aucune division par appel).
+
+    Args:
+        center_x (float): Position horizontale de la ligne
+        half_width (float): Demi-largeur de l'image
+        inv_half_width (float): Inverse de la demi-largeur
+        steer_gain (float): -max_steering / half_width
+        base_speed (float): Vitesse en ligne droite
+        min_speed (float): Vitesse minimale
+        max_steering (float): Angle maximum de braquage
+
+    Returns:
+        tuple: (angle de braquage borné, vitesse)
+    """
+    error_px = center_x - half_width
+    angle = min(max(error_px * steer_gain, -max_steering), max_steering)
+    speed = max(base_speed - base_speed * abs(error_px) * inv_half_width,
+                min_speed)
+    return angle, speed
 
 class Navigator:
     """
@@ -39,47 +70,60 @@ class Navigator:
         self.min_speed = 15
         self.max_steering = 30
         
+        # Constantes précalculées du suivi de ligne
+        # (à recalculer si max_steering est modifié)
+        self._half_w = FRAME_WIDTH / 2.0
+        self._inv_half_w = 1.0 / self._half_w
+        self._steer_gain = -self.max_steering / self._half_w
+        
         # État actuel
         self.state = NavigationState.SUIVRE_LIGNE
         self.last_line_pos = None
         self.panneau_en_cours = None
         
+        # Temporisation non bloquante (panneaux)
+        self._wait_until = 0.0
+        self._post_wait_state = None
+        self._post_wait_steering = None
+        
         self.logger.info("Navigateur initialisé")
 
-    def update_from_vision(self, vision_data):
+    def update_from_vision(self, record):
         """
         Met à jour la navigation selon les données de vision.
 
         Args:
-            vision_data (dict): Données de vision (ligne et panneaux)
+            record (np.void): Enregistrement FRAME_DTYPE (ligne et panneau)
         """
         try:
-            if not vision_data:
-                return
-
-            line_info = vision_data.get('line_info', {})
-            signs = vision_data.get('signs', [])
+            sign_class = record['sign_class']
             
-            # Traitement des panneaux prioritaires
-            if signs and self.state != NavigationState.TRAITER_PANNEAU:
-                self.handle_sign(signs[0])
+            # Traitement des panneaux prioritaires (jamais pendant un
+            # arrêt ou une attente de commande : seule une commande
+            # peut en faire sortir)
+            if sign_class >= 0 and self.state not in (
+                    NavigationState.TRAITER_PANNEAU,
+                    NavigationState.ARRET_TEMPORISE,
+                    NavigationState.ARRET,
+                    NavigationState.ATTENTE_COMMANDE):
+                self.handle_sign(SIGN_CLASSES[sign_class])
             
             # Suivi de ligne si pas d'autre action en cours
             elif self.state == NavigationState.SUIVRE_LIGNE:
-                self.follow_line(line_info)
+                self.follow_line(record)
                 
         except Exception as e:
             self.logger.error(f"Erreur de mise à jour navigation: {str(e)}")
 
-    def follow_line(self, line_info):
+    def follow_line(self, record):
         """
         Implémente la logique de suivi de ligne.
 
         Args:
-            line_info (dict): Informations sur la ligne détectée
+            record (np.void): Enregistrement FRAME_DTYPE
         """
         try:
-            if not line_info.get('detected'):
+            if not record['line_detected']:
                 if self.last_line_pos:
                     # Continuer dans la dernière direction connue
                     self.motor_controller.set_speed(self.min_speed)
@@ -88,39 +132,31 @@ class Navigator:
                     self.motor_controller.stop()
                 return
 
-            # Calcul de l'erreur de position
-            position = line_info['position']
-            center_x = position[0]
-            frame_width = 640  # Largeur supposée de l'image
-            
-            # Calcul de l'angle de correction
-            error = (center_x - frame_width/2) / (frame_width/2)
-            steering_angle = -error * self.max_steering
-            
-            # Application des commandes
-            self.motor_controller.set_steering(steering_angle)
+            # Calcul de l'angle de correction et de la vitesse
+            line_x = record['line_x']
+            angle, speed = compute_line_cmd(
+                line_x, self._half_w, self._inv_half_w, self._steer_gain,
+                self.base_speed, self.min_speed, self.max_steering
+            )
             
-            # Ajustement de la vitesse selon l'angle
-            speed = self.base_speed * (1 - abs(error))
-            speed = max(speed, self.min_speed)
-            self.motor_controller.set_speed(speed)
+            # Application des commandes (valeurs déjà bornées)
+            self.motor_controller.set_motion(angle, speed)
             
-            self.last_line_pos = position
+            self.last_line_pos = (line_x, record['line_y'])
             
         except Exception as e:
             self.logger.error(f"Erreur suivi de ligne: {str(e)}")
             self.motor_controller.stop()
 
-    def handle_sign(self, sign_info):
+    def handle_sign(self, sign_class):
         """
         Gère la réaction à un panneau détecté.
 
         Args:
-            sign_info (dict): Informations sur le panneau détecté
+            sign_class (str): Classe du panneau (voir SIGN_CLASSES)
         """
         try:
             self.state = NavigationState.TRAITER_PANNEAU
-            sign_class = sign_info['class']
             
             if sign_class == 'STOP':
                 self.handle_stop_sign()
@@ -133,12 +169,26 @@ class Navigator:
             self.logger.error(f"Erreur traitement panneau: {str(e)}")
             self.state = NavigationState.SUIVRE_LIGNE
 
+    def _start_wait(self, duration, next_state, steering=None):
+        """
+        Démarre une temporisation sans bloquer la boucle de navigation.
+
+        Args:
+            duration (float): Durée de l'attente en secondes
+            next_state (NavigationState): État à rétablir après l'attente
+            steering (float): Braquage à appliquer à la fin (optionnel)
+        """
+        self._wait_until = time.monotonic() + duration
+        self._post_wait_state = next_state
+        self._post_wait_steering = steering
+        self.state = NavigationState.ARRET_TEMPORISE
+
     def handle_stop_sign(self):
         """Gère l'arrêt au panneau STOP."""
         try:
             self.motor_controller.stop()
-            time.sleep(2)  # Attente réglementaire
-            self.state = NavigationState.SUIVRE_LIGNE
+            # Attente réglementaire
+            self._start_wait(2.0, NavigationState.SUIVRE_LIGNE)
         except Exception as e:
             self.logger.error(f"Erreur arrêt STOP: {str(e)}")
 
@@ -153,13 +203,9 @@ class Navigator:
             # Ralentissement
             self.motor_controller.set_speed(self.min_speed)
             
-            # Application du virage
+            # Application du virage, puis retour en mode normal
             self.motor_controller.set_steering(angle)
-            time.sleep(1)  # Durée du virage
-            
-            # Retour en mode normal
-            self.motor_controller.set_steering(0)
-            self.state = NavigationState.SUIVRE_LIGNE
+            self._start_wait(1.0, NavigationState.SUIVRE_LIGNE, steering=0)
         except Exception as e:
             self.logger.error(f"Erreur virage: {str(e)}")
             self.motor_controller.stop()
@@ -181,6 +227,16 @@ class Navigator:
                 self.motor_controller.set_steering(command['value'])
             elif command.get('type') == 'stop':
                 self.motor_controller.stop()
+            elif command.get('type') == 'emergency_stop':
+                # Arrêt unique à l'entrée : l'état ARRET ne renvoie
+                # plus de commande aux moteurs
+                self.motor_controller.emergency_stop()
+                self.state = NavigationState.ARRET
+            elif command.get('type') == 'resume':
+                # Seule sortie de ARRET / ATTENTE_COMMANDE
+                if self.state in (NavigationState.ARRET,
+                                  NavigationState.ATTENTE_COMMANDE):
+                    self.state = NavigationState.SUIVRE_LIGNE
                 
         except Exception as e:
             self.logger.error(f"Erreur traitement commande: {str(e)}")
@@ -188,8 +244,11 @@ class Navigator:
     def update(self):
         """Met à jour l'état de la navigation."""
         try:
-            # Vérification de l'état des moteurs
-            if self.state == NavigationState.ARRET:
-                self.motor_controller.stop()
+            # Fin de temporisation
+            if (self.state == NavigationState.ARRET_TEMPORISE
+                  and time.monotonic() >= self._wait_until):
+                if self._post_wait_steering is not None:
+                    self.motor_controller.set_steering(self._post_wait_steering)
+                self.state = self._post_wait_state
         except Exception as e:
             self.logger.error(f"Erreur mise à jour: {str(e)}")
@@ -1,5 +1,5 @@
 import logging
-from ..vision.camera import CameraModule
+from ..vision.detection_worker import DetectionWorker, COLORS
 from .motor_control import MotorController
 import time
 
@@ -8,10 +8,20 @@ class RobotController:
     Contrôleur principal du robot.
     Intègre la vision et le contrôle moteur.
     """
-    def __init__(self):
+    def __init__(self, px=None, detection=None):
+        """
+        Args:
+            px (Picarx): Instance du robot à partager (créée si absente)
+            detection (DetectionWorker): Processus de détection à partager
+                (créé et démarré si absent)
+        """
         self.logger = logging.getLogger('PiCarX.Controller')
-        self.camera = CameraModule()
-        self.motor = MotorController()
+        self._owns_detection = detection is None
+        if detection is None:
+            detection = DetectionWorker()
+            detection.start()
+        self.detection = detection
+        self.motor = MotorController(px=px)
         
         # Paramètres de suivi
         self.tracking_enabled = False
@@ -21,12 +31,12 @@ class RobotController:
         """Active le suivi de couleur"""
         self.tracking_enabled = True
         self.target_color = color
-        self.camera.start_color_detection(color)
+        self.detection.color_detect(COLORS.index(color))
         
     def stop_color_tracking(self):
         """Désactive le suivi de couleur"""
         self.tracking_enabled = False
-        self.camera.stop_color_detection()
+        self.detection.color_detect(0)  # 'close'
         self.motor.stop()
         
     def update(self):
@@ -34,15 +44,14 @@ class RobotController:
         if not self.tracking_enabled:
             return
             
-        # Obtenir les informations de détection
-        info = self.camera.get_detection_info()
+        # Obtenir les derniers résultats du processus de détection
+        info = self.detection.latest_detection()
         
-        if 'color' in info:
-            color_info = info['color']
-            if color_info['count'] > 0:
+        if self.target_color is not None:
+            if info['color_n'] > 0:
                 # Calculer l'erreur de position
-                x_pos = color_info['position'][0]
-                width = color_info['size'][0]
+                x_pos = int(info['color_x'])
+                width = int(info['color_w'])
                 
                 # Centre de l'image est à 320 (pour une image 640x480)
                 error = (x_pos - 320) / 320  # Normalisation entre -1 et 1
@@ -64,5 +73,6 @@ class RobotController:
         
     def cleanup(self):
         """Nettoie les ressources du robot"""
-        self.camera.release()
+        if self._owns_detection:
+            self.detection.stop()
         self.motor.stop()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module du Capteur Ultrasonique
+----------------------------
+Lit le capteur ultrasonique dans un thread de fond.
+La lecture (attente de l'écho, ~30 ms) ne bloque plus la boucle
+de contrôle, qui consulte simplement la dernière distance mesurée.
+"""
+
+import logging
+import multiprocessing as mp
+import threading
+import time
+
+# Distance publiée pour une lecture invalide (considérée comme sûre)
+INVALID_DISTANCE = 999
+
+
+class UltrasonicMonitor:
+    """
+    Mesure périodique de la distance aux obstacles.
+    La dernière distance (en cm entiers) est partagée via un Value.
+    """
+
+    def __init__(self, px, period=0.05):
+        """
+        Initialise le moniteur.
+
+        Args:
+            px (Picarx): Instance du robot
+            period (float): Période de mesure en secondes
+        """
+        self.logger = logging.getLogger('PiCarX.Ultrasonic')
+        self.px = px
+        self.period = period
+        self._dist_shared = mp.Value('i', INVALID_DISTANCE)
+        self._running = False
+        self._thread = None
+
+    @property
+    def distance(self):
+        """int: Dernière distance mesurée en cm (lecture non bloquante)."""
+        return self._dist_shared.value
+
+    def start(self):
+        """Démarre le thread de mesure."""
+        self._running = True
+        self._thread = threading.Thread(target=self._ultrasonic_worker)
+        self._thread.daemon = True
+        self._thread.start()
+        self.logger.info("Mesure ultrasonique démarrée")
+
+    def stop(self):
+        """Arrête le thread de mesure."""
+        self._running = False
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _ultrasonic_worker(self):
+        """Boucle de mesure du thread de fond."""
+        read = self.px.ultrasonic.read
+        while self._running:
+            try:
+                d = read()
+                self._dist_shared.value = (
+                    int(d) if 0 <= d <= 1000 else INVALID_DISTANCE
+                )
+            except Exception as e:
+                self.logger.error(f"Erreur lors de la lecture du capteur: {str(e)}")
+                self._dist_shared.value = INVALID_DISTANCE
+            time.sleep(self.period)
@@ -7,14 +7,24 @@ Gère les paramètres de configuration du système PiCarX.
 Permet de charger/sauvegarder les configurations depuis un fichier.
 """
 
+import functools
 import yaml
+import pickle
 import logging
 from pathlib import Path
 
+# Analyseur YAML en C (libyaml) si disponible, sinon version Python
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 class Configuration:
     """
     Gestionnaire de configuration du système.
     Centralise tous les paramètres configurables.
+    Utiliser get_config() pour partager une seule configuration
+    (un seul chargement du fichier) par processus.
     """
 
     def __init__(self, config_file="config.yaml"):
@@ -35,7 +45,8 @@ class Configuration:
                 'exposure': 'auto'
             },
             'line_detector': {
-                'threshold': 127,
+                'block_size': 7,  # Voisinage du seuillage adaptatif
+                'offset': 5,
                 'roi_height': 0.5  # Portion de l'image à analyser
             },
             'sign_detector': {
@@ -55,8 +66,11 @@ class Configuration:
             }
         }
         
-        # Chargement de la configuration
+        # Chargement de la configuration, puis index des clés pointées
+        # (e.g., "camera.resolution") reconstruit à chaque modification
         self.config = self.load_config()
+        self._flat = {}
+        self._rebuild_caches()
 
     def load_config(self):
         """
@@ -68,8 +82,7 @@ class Configuration:
         """
         try:
             if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    loaded_config = yaml.safe_load(f)
+                loaded_config = self._read_config_file()
                     
                 # Fusion avec la configuration par défaut
                 config = self.default_config.copy()
@@ -87,6 +100,38 @@ class Configuration:
             self.logger.error(f"Erreur de chargement config: {str(e)}")
             return self.default_config.copy()
 
+    def _read_config_file(self):
+        """
+        Lit le fichier YAML, en passant par un cache pickle
+        (config.yaml.pkl) tant que le fichier source n'a pas changé.
+
+        Returns:
+            dict: Contenu du fichier de configuration
+        """
+        src_mtime = self.config_file.stat().st_mtime
+        cache_file = self.config_file.with_name(self.config_file.name + '.pkl')
+        
+        try:
+            if cache_file.exists():
+                with open(cache_file, 'rb') as f:
+                    cached_mtime, cached_config = pickle.load(f)
+                if cached_mtime == src_mtime:
+                    return cached_config
+        except Exception as e:
+            self.logger.warning(f"Cache de configuration ignoré: {str(e)}")
+        
+        with open(self.config_file, 'r') as f:
+            loaded_config = yaml.load(f, Loader=SafeLoader)
+        
+        try:
+            with open(cache_file, 'wb') as f:
+                pickle.dump((src_mtime, loaded_config), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            self.logger.warning(f"Écriture du cache impossible: {str(e)}")
+        
+        return loaded_config
+
     def save_config(self):
         """Sauvegarde la configuration actuelle dans le fichier."""
         try:
@@ -110,6 +155,27 @@ class Configuration:
             else:
                 base_dict[key] = value
 
+    def _flatten(self, d, prefix=''):
+        """
+        Indexe récursivement la configuration par clé pointée.
+        Les sections intermédiaires (e.g., "camera") sont aussi indexées.
+
+        Args:
+            d (dict): Dictionnaire à parcourir
+            prefix (str): Préfixe des clés de ce niveau
+        """
+        if not prefix:
+            self._flat.clear()
+        for key, value in d.items():
+            flat_key = f"{prefix}{key}"
+            self._flat[flat_key] = value
+            if isinstance(value, dict):
+                self._flatten(value, f"{flat_key}.")
+
+    def _rebuild_caches(self):
+        """Reconstruit l'index des clés pointées après modification."""
+        self._flatten(self.config)
+
     def get(self, key, default=None):
         """
         Récupère une valeur de configuration.
@@ -121,15 +187,7 @@ class Configuration:
         Returns:
             Valeur de configuration
         """
-        try:
-            # Gestion des clés imbriquées (e.g., "camera.resolution")
-            keys = key.split('.')
-            value = self.config
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        return self._flat.get(key, default)
 
     def set(self, key, value):
         """
@@ -140,10 +198,65 @@ class Configuration:
             value: Nouvelle valeur
         """
         try:
-            keys = key.split('.')
-            config = self.config
-            for k in keys[:-1]:
-                config = config.setdefault(k, {})
-            config[keys[-1]] = value
+            self._assign(key, value)
+            self._rebuild_caches()
         except Exception as e:
             self.logger.error(f"Erreur de modification config: {str(e)}")
+
+    def update(self, mapping):
+        """
+        Définit plusieurs valeurs de configuration en une fois.
+        L'index des clés n'est reconstruit qu'une seule fois.
+
+        Args:
+            mapping (dict): Nouvelles valeurs par clé (notation pointée possible)
+        """
+        for key, value in mapping.items():
+            try:
+                self._assign(key, value)
+            except Exception as e:
+                self.logger.error(f"Erreur de modification config ({key}): {str(e)}")
+        self._rebuild_caches()
+
+    def _assign(self, key, value):
+        """
+        Écrit une valeur dans la configuration, sans reconstruire l'index.
+
+        Args:
+            key (str): Clé de configuration (notation pointée possible)
+            value: Nouvelle valeur
+        """
+        keys = key.split('.')
+        config = self.config
+        for k in keys[:-1]:
+            config = config.setdefault(k, {})
+        config[keys[-1]] = value
+
+
+def get_config(path="config.yaml"):
+    """
+    Retourne la configuration partagée du processus.
+    Le fichier n'est lu qu'une fois par chemin (chemins normalisés :
+    "config.yaml" et "./config.yaml" désignent la même instance).
+
+    Args:
+        path (str): Chemin vers le fichier de configuration
+
+    Returns:
+        Configuration: Instance partagée pour ce chemin
+    """
+    return _cached_config(Path(path).resolve())
+
+
+@functools.cache
+def _cached_config(path):
+    """
+    Crée la configuration d'un chemin absolu, une seule fois.
+
+    Args:
+        path (Path): Chemin normalisé du fichier de configuration
+
+    Returns:
+        Configuration: Instance partagée pour ce chemin
+    """
+    return Configuration(path)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module de Communication Inter-Processus
+-------------------------------------
+Fournit les structures partagées entre les processus du PiCarX :
+- Une file circulaire mono-producteur / mono-consommateur (SPSC)
+  en mémoire partagée, sans sérialisation ni verrou
+- Le format d'enregistrement des données de vision
+"""
+
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Classes de panneaux reconnues par la navigation (index = code entier)
+SIGN_CLASSES = ('STOP', 'GAUCHE', 'DROITE')
+
+# Classe déduite de la couleur d'un panneau, tant que SignDetector ne
+# fournit que des couleurs : rouge = STOP. Bleu ne permet pas de
+# distinguer GAUCHE de DROITE, ces classes restent donc inatteignables
+# sans classification de forme.
+SIGN_COLOR_CLASSES = {'red': 'STOP'}
+
+# Enregistrement de vision de taille fixe échangé à chaque image
+FRAME_DTYPE = np.dtype([
+    ('line_detected', 'u1'),
+    ('line_x', 'f4'),
+    ('line_y', 'f4'),
+    ('sign_class', 'i2'),   # -1 si aucun panneau
+    ('sign_conf', 'f4'),
+    ('timestamp', 'u8')     # time.monotonic_ns()
+])
+
+
+class SPSCRing:
+    """
+    File circulaire SPSC en mémoire partagée.
+    Un seul processus écrit (push), un seul lit (pop).
+    Si le consommateur prend du retard, les enregistrements
+    les plus anciens sont écrasés : seule l'information récente
+    est utile au pilotage.
+
+    Avec notify=True, chaque publication signale un eventfd : le
+    consommateur peut alors attendre la file avec select/selectors
+    au lieu de la scruter.
+
+    Ordonnancement mémoire : Python n'offre pas de barrière explicite.
+    Les indices et les numéros de séquence des emplacements sont donc
+    lus et écrits sous un verrou partagé, dont la prise et la libération
+    (sémaphore POSIX) synchronisent la mémoire entre processus. Les
+    enregistrements eux-mêmes sont copiés hors verrou : le numéro de
+    séquence de l'emplacement (verrou de séquence), relu après la copie,
+    détecte un écrasement par un producteur qui a fait le tour.
+    """
+
+    # Écart (en entiers 64 bits) entre les indices tête et queue :
+    # 8 octets d'indice + 56 octets de bourrage = une ligne de cache
+    _INDEX_STRIDE = 8
+
+    def __init__(self, dtype, capacity=16, notify=False):
+        """
+        Initialise la file circulaire.
+
+        Args:
+            dtype (np.dtype): Format d'un enregistrement
+            capacity (int): Nombre d'emplacements (puissance de deux)
+            notify (bool): Signale chaque publication par un eventfd
+        """
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError("La capacité doit être une puissance de deux")
+
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self.mask = capacity - 1
+
+        # Emplacements des enregistrements en mémoire partagée
+        self._shm = shared_memory.SharedMemory(
+            create=True,
+            size=capacity * self.dtype.itemsize
+        )
+        self._slots = np.ndarray(
+            (capacity,), dtype=self.dtype, buffer=self._shm.buf
+        )
+        self._slots[:] = 0
+
+        # Indices tête/queue sur deux lignes de cache distinctes
+        # (évite le faux partage entre producteur et consommateur)
+        self._indices = mp.RawArray('Q', 2 * self._INDEX_STRIDE)
+
+        # Numéro de séquence par emplacement : index + 1 de
+        # l'enregistrement publié, 0 pendant son écriture
+        self._seq = mp.RawArray('Q', capacity)
+        self._lock = mp.Lock()
+
+        # Notification des publications (hérité par fork)
+        self._event_fd = os.eventfd(0, os.EFD_NONBLOCK) if notify else None
+
+    def fileno(self):
+        """
+        Descripteur à surveiller en lecture (file créée avec notify=True).
+
+        Returns:
+            int: Descripteur de l'eventfd
+        """
+        return self._event_fd
+
+    def clear_notification(self):
+        """Acquitte les notifications en attente (côté consommateur)."""
+        try:
+            os.eventfd_read(self._event_fd)
+        except BlockingIOError:
+            pass
+
+    def _notify(self):
+        if self._event_fd is not None:
+            os.eventfd_write(self._event_fd, 1)
+
+    def push(self, record):
+        """
+        Ajoute un enregistrement (côté producteur).
+
+        Args:
+            record: Enregistrement compatible avec le dtype de la file
+        """
+        self._slots[self._begin_write()] = record
+        self.commit()
+
+    def reserve(self):
+        """
+        Retourne l'emplacement à remplir sur place (côté producteur).
+        L'enregistrement n'est visible qu'après commit().
+
+        Returns:
+            np.void: Vue sur l'emplacement libre
+        """
+        return self._slots[self._begin_write()]
+
+    def _begin_write(self):
+        """
+        Marque l'emplacement libre en cours d'écriture, avant
+        toute modification (côté producteur).
+
+        Returns:
+            int: Index de l'emplacement
+        """
+        slot = self._indices[0] & self.mask
+        with self._lock:
+            self._seq[slot] = 0
+        return slot
+
+    def commit(self):
+        """Publie l'emplacement obtenu par reserve()."""
+        head = self._indices[0]
+        # Publication : le verrou ordonne l'écriture de l'enregistrement
+        # avant la mise à jour de la séquence et de l'indice
+        with self._lock:
+            self._seq[head & self.mask] = head + 1
+            self._indices[0] = head + 1
+        self._notify()
+
+    def _read(self, latest):
+        """
+        Copie un enregistrement publié (côté consommateur).
+
+        Args:
+            latest (bool): Le plus récent (et vide la file) plutôt
+                que le plus ancien
+
+        Returns:
+            np.void: Copie de l'enregistrement, ou None si la file est vide
+        """
+        while True:
+            with self._lock:
+                head = self._indices[0]
+                tail = self._indices[self._INDEX_STRIDE]
+            if head == tail:
+                return None
+
+            if latest:
+                index = head - 1
+            elif head - tail > self.mask:
+                # Le producteur a fait le tour : on saute les plus anciens
+                index = head - self.mask
+            else:
+                index = tail
+            slot = index & self.mask
+
+            record = self._slots[slot].copy()
+
+            # Emplacement réécrit pendant la copie : nouvel essai
+            with self._lock:
+                if self._seq[slot] == index + 1:
+                    self._indices[self._INDEX_STRIDE] = head if latest else index + 1
+                    return record
+
+    def pop(self):
+        """
+        Retire l'enregistrement le plus ancien (côté consommateur).
+
+        Returns:
+            np.void: Copie de l'enregistrement, ou None si la file est vide
+        """
+        return self._read(latest=False)
+
+    def pop_latest(self):
+        """
+        Vide la file et retourne l'enregistrement le plus récent.
+
+        Returns:
+            np.void: Copie de l'enregistrement, ou None si la file est vide
+        """
+        return self._read(latest=True)
+
+    def close(self):
+        """Libère la mémoire partagée (à appeler par le créateur)."""
+        self._slots = None
+        self._shm.close()
+        self._shm.unlink()
+        if self._event_fd is not None:
+            os.close(self._event_fd)
+            self._event_fd = None
+
+
+def encode_vision(record, line_info, signs, timestamp):
+    """
+    Écrit les résultats de vision dans un enregistrement FRAME_DTYPE,
+    sur place (aucune allocation).
+
+    Args:
+        record (np.void): Emplacement à remplir (voir SPSCRing.reserve)
+        line_info (dict): Résultat du détecteur de ligne
+        signs (list): Panneaux détectés
+        timestamp (int): Horodatage monotone de l'image (ns)
+    """
+    if line_info.get('detected'):
+        record['line_detected'] = 1
+        record['line_x'], record['line_y'] = line_info['position']
+    else:
+        record['line_detected'] = 0
+
+    record['sign_class'] = -1
+    for sign in signs:
+        sign_class = sign.get('class') or SIGN_COLOR_CLASSES.get(sign.get('color'))
+        if sign_class in SIGN_CLASSES:
+            record['sign_class'] = SIGN_CLASSES.index(sign_class)
+            record['sign_conf'] = sign.get('confidence', 0.0)
+            break
+
+    record['timestamp'] = timestamp
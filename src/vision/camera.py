@@ -2,37 +2,97 @@
 Module de gestion de la caméra
 """
 
-from vilib import Vilib
+from picamera2 import Picamera2
 import cv2
 import logging
 import time
-import os
 import subprocess
 import numpy as np
-from time import strftime, localtime, time, sleep
+from time import strftime, localtime, time, sleep, monotonic
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Écriture des photos sur disque en arrière-plan (hors boucle de contrôle)
+_PHOTO_WRITER = ThreadPoolExecutor(max_workers=1)
+
+# Délai entre deux tentatives de démarrage de la capture (secondes),
+# doublé à chaque échec consécutif jusqu'au maximum
+CAPTURE_RETRY_DELAY = 0.5
+CAPTURE_RETRY_MAX_DELAY = 10.0
 
 class CameraModule:
     """
-    Module de gestion de la caméra utilisant vilib.
-    Fournit des fonctionnalités de vision avancées.
+    Module de gestion de la caméra utilisant Picamera2.
+    Les détections Vilib (couleurs, visages) sont assurées par
+    DetectionWorker, dans son propre processus.
     """
     def __init__(self):
         """Initialise la caméra"""
         self.logger = logging.getLogger('PiCarX.Camera')
-        self.temp_file = "/tmp/picarx_frame.jpg"
-        self.face_detection_active = False
-        self.color_detection_active = False
-        self.qr_detection_active = False
-        self.qr_thread = None
         self.streaming_process = None
         self.streaming_active = False
         self._check_camera()
         
-        # Initialisation optimisée de la caméra
-        Vilib.camera_start(vflip=False, hflip=False)
-        Vilib.display(local=False, web=True)
-        sleep(0.8)  # Attente optimisée pour l'initialisation
+        # Capture continue (démarrée au premier get_frame, dans le
+        # processus qui consomme les images)
+        self.picam2 = None
+        self._capture_thread = None
+        self._capture_active = False
+        self._frame_cond = threading.Condition()
+        self._latest = None
+        self._frame_id = 0
+        self._read_id = 0
+        self._start_failures = 0
+        self._retry_at = 0.0
+
+    def _start_capture(self):
+        """Démarre Picamera2 et le thread producteur d'images"""
+        # Capture en processus avec Picamera2 (tampons DMA réutilisés).
+        # "RGB888" de libcamera correspond à l'ordre BGR d'OpenCV en mémoire.
+        # self.picam2 n'est publié qu'une fois la capture lancée : en cas
+        # d'échec, la caméra est libérée et le prochain get_frame réessaie
+        picam2 = Picamera2()
+        try:
+            config = picam2.create_video_configuration(
+                main={"size": (320, 240), "format": "RGB888"},
+                buffer_count=4
+            )
+            picam2.configure(config)
+            picam2.start()
+            
+            self._capture_active = True
+            self._capture_thread = threading.Thread(
+                target=self._capture_loop, args=(picam2.capture_array,)
+            )
+            self._capture_thread.daemon = True
+            self._capture_thread.start()
+        except Exception:
+            self._capture_active = False
+            picam2.close()
+            raise
+        
+        self.picam2 = picam2
+        self.logger.info("Capture continue démarrée")
+
+    def _capture_loop(self, capture):
+        """
+        Boucle du thread producteur : conserve la dernière image
+
+        Args:
+            capture (callable): Méthode capture_array de Picamera2
+        """
+        while self._capture_active:
+            try:
+                frame = capture("main")
+            except Exception as e:
+                self.logger.error(f"Erreur capture image: {str(e)}")
+                sleep(0.1)
+                continue
+            with self._frame_cond:
+                self._latest = frame
+                self._frame_id += 1
+                self._frame_cond.notify_all()
 
     def _check_camera(self):
         """Vérifie si la caméra est disponible"""
@@ -50,181 +110,130 @@ class CameraModule:
             self.logger.error(f"Erreur de vérification caméra: {str(e)}")
             raise
 
-    def get_frame(self):
-        """Capture une image avec libcamera"""
+    def get_frame(self, timeout=1.0):
+        """
+        Retourne l'image la plus récente (tableau BGR, par référence).
+        Attend qu'une image plus récente que la précédente soit disponible.
+
+        Args:
+            timeout (float): Attente maximale en secondes
+
+        Returns:
+            np.array: Image BGR, ou None si aucune nouvelle image
+        """
         try:
-            # Capture d'une image avec libcamera-still
-            result = subprocess.run([
-                "libcamera-still",
-                "-n",                    # Pas de prévisualisation
-                "--immediate",           # Capture immédiate
-                "-o", self.temp_file,    # Fichier de sortie
-                "--width", "320",        # Largeur
-                "--height", "240",       # Hauteur
-                "--timeout", "1000",     # Timeout en ms
-                "--nopreview"           # Pas de prévisualisation
-            ], capture_output=True)
-            
-            if result.returncode != 0:
-                self.logger.error(f"Erreur capture: {result.stderr.decode()}")
+            if self.picam2 is None and not self._try_start_capture(timeout):
                 return None
-            
-            # Lecture de l'image avec OpenCV
-            frame = cv2.imread(self.temp_file)
-            if frame is None:
-                self.logger.warning("Échec de lecture de l'image")
-                return None
-                
-            return frame
-            
+            with self._frame_cond:
+                if not self._frame_cond.wait_for(
+                        lambda: self._frame_id != self._read_id, timeout):
+                    self.logger.warning("Aucune nouvelle image disponible")
+                    return None
+                self._read_id = self._frame_id
+                return self._latest
         except Exception as e:
             self.logger.error(f"Erreur capture image: {str(e)}")
             return None
 
+    def _try_start_capture(self, timeout):
+        """
+        Démarre la capture, en espaçant les tentatives après un échec
+        (caméra occupée par un autre processus, par exemple).
+
+        Args:
+            timeout (float): Attente maximale en secondes si une
+                tentative n'est pas encore permise
+
+        Returns:
+            bool: True si la capture est démarrée
+        """
+        remaining = self._retry_at - monotonic()
+        if remaining > 0:
+            # Attente bornée : l'appelant peut reboucler sans tourner à vide
+            sleep(min(remaining, timeout))
+            return False
+        
+        try:
+            self._start_capture()
+        except Exception as e:
+            self._start_failures += 1
+            delay = min(CAPTURE_RETRY_DELAY * 2 ** (self._start_failures - 1),
+                        CAPTURE_RETRY_MAX_DELAY)
+            self._retry_at = monotonic() + delay
+            self.logger.error(
+                f"Démarrage de la capture impossible (échec {self._start_failures}), "
+                f"nouvel essai dans {delay:.1f} s: {str(e)}"
+            )
+            return False
+        
+        self._start_failures = 0
+        return True
+
     def release(self):
         """Libère les ressources de la caméra"""
         try:
-            if os.path.exists(self.temp_file):
-                os.remove(self.temp_file)
+            if self.picam2 is not None:
+                self._capture_active = False
+                self._capture_thread.join()
+                self.picam2.stop()
+                self.picam2.close()
+                self.picam2 = None
             self.stop_streaming()
-            self.stop_face_detection()
-            self.stop_color_detection()
-            self.stop_qr_detection()
-            Vilib.camera_close()
             self.logger.info("Ressources de la caméra libérées")
         except Exception as e:
             self.logger.error(f"Erreur lors de la libération de la caméra: {str(e)}")
 
-    def start_face_detection(self):
-        """Détection de visage optimisée"""
-        Vilib.face_detect_switch(True)
-        self.logger.info("Détection de visage activée")
-
-    def stop_face_detection(self):
-        """Désactive la détection de visages"""
-        self.face_detection_active = False
-        Vilib.face_detect_switch(False)
-        self.logger.info("Détection de visages désactivée")
-
-    def start_color_detection(self, color="red"):
-        """Détection de couleur optimisée"""
-        Vilib.color_detect(color)
-        self.logger.info(f"Détection de couleur {color} activée")
-
-    def stop_color_detection(self):
-        """Désactive la détection de couleur"""
-        self.color_detection_active = False
-        Vilib.color_detect('close')
-        self.logger.info("Détection de couleur désactivée")
+    def capture_jpeg(self, quality=85):
+        """
+        Encode l'image courante en JPEG, en mémoire.
 
-    def start_qr_detection(self):
-        """Active la détection de QR codes"""
-        self.qr_detection_active = True
-        
-        def qr_detection_thread():
-            Vilib.qrcode_detect_switch(True)
-            last_text = None
-            while self.qr_detection_active:
-                text = Vilib.detect_obj_parameter['qr_data']
-                if text != "None" and text != last_text:
-                    last_text = text
-                    self.logger.info(f'QR code détecté: {text}')
-                sleep(0.5)
-            Vilib.qrcode_detect_switch(False)
-
-        self.qr_thread = threading.Thread(target=qr_detection_thread)
-        self.qr_thread.daemon = True
-        self.qr_thread.start()
-        self.logger.info("Détection de QR codes activée")
+        Args:
+            quality (int): Qualité JPEG (0-100)
 
-    def stop_qr_detection(self):
-        """Désactive la détection de QR codes"""
-        self.qr_detection_active = False
-        if self.qr_thread:
-            self.qr_thread.join()
-        self.logger.info("Détection de QR codes désactivée")
+        Returns:
+            bytes: Image JPEG, ou None si aucune image
+        """
+        frame = self.get_frame()
+        if frame is None:
+            return None
+        ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return buf.tobytes() if ok else None
 
     def take_photo(self):
-        """Capture de photo optimisée"""
-        _time = strftime('%Y-%m-%d-%H-%M-%S',localtime(time()))
-        name = f'photo_{_time}'
-        path = f"{os.path.expanduser('~')}/Pictures/picar-x/"
-        os.makedirs(path, exist_ok=True)
-        Vilib.take_photo(name, path)
-        self.logger.info(f'Photo sauvegardée: {path}{name}.jpg')
-        return f'{path}{name}.jpg'
+        """
+        Capture de photo (écriture sur disque en arrière-plan).
 
-    def get_detection_info(self):
-        """Retourne les informations de détection actuelles"""
-        info = {}
+        Returns:
+            str: Chemin du fichier en cours d'écriture, ou None
+        """
+        data = self.capture_jpeg()
+        if data is None:
+            self.logger.error("Photo impossible: aucune image disponible")
+            return None
         
-        if self.color_detection_active:
-            info['color'] = {
-                'count': Vilib.detect_obj_parameter['color_n'],
-                'position': (Vilib.detect_obj_parameter['color_x'],
-                           Vilib.detect_obj_parameter['color_y']),
-                'size': (Vilib.detect_obj_parameter['color_w'],
-                        Vilib.detect_obj_parameter['color_h'])
-            }
-            
-        if self.face_detection_active:
-            info['face'] = {
-                'count': Vilib.detect_obj_parameter['human_n'],
-                'position': (Vilib.detect_obj_parameter['human_x'],
-                           Vilib.detect_obj_parameter['human_y']),
-                'size': (Vilib.detect_obj_parameter['human_w'],
-                        Vilib.detect_obj_parameter['human_h'])
-            }
-            
-        return info 
-
-    def start_streaming(self):
-        """Démarrage du streaming optimisé"""
-        if not self.streaming_active:
-            Vilib.camera_start(vflip=False, hflip=False)
-            Vilib.display(local=False, web=True)
-            self.streaming_active = True
-            self.logger.info("Streaming démarré")
+        _time = strftime('%Y-%m-%d-%H-%M-%S',localtime(time()))
+        path = Path.home() / 'Pictures' / 'picar-x'
+        path.mkdir(parents=True, exist_ok=True)
+        photo = path / f'photo_{_time}.jpg'
+        future = _PHOTO_WRITER.submit(photo.write_bytes, data)
+        future.add_done_callback(
+            lambda f: self._photo_written(f, photo)
+        )
+        return str(photo)
 
-    def stop_streaming(self):
-        """Arrête le streaming MJPG"""
-        if self.streaming_process:
-            self.streaming_process.terminate()
-            self.streaming_active = False
+    def _photo_written(self, future, photo):
+        """
+        Journalise le résultat de l'écriture d'une photo.
 
-    def start_streaming(self):
-        """Démarre le streaming MJPG sur le port 8080"""
-        try:
-            cmd = [
-                'mjpg_streamer',
-                '-i', 'input_uvc.so -r 640x480 -f 30',
-                '-o', 'output_http.so -p 8080 -w /usr/local/share/mjpg-streamer/www'
-            ]
-            
-            self.streaming_process = subprocess.Popen(
-                ' '.join(cmd),
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            
-            self.streaming_active = True
-            
-            # Afficher l'URL d'accès
-            import socket
-            hostname = socket.gethostname()
-            ip_address = socket.gethostbyname(hostname)
-            print(f"\nFlux vidéo disponible sur : http://{ip_address}:8080")
-            print("Utilisez cette adresse dans votre navigateur pour voir le flux vidéo")
-            
-        except Exception as e:
-            self.logger.error(f"Erreur lors du démarrage du streaming: {str(e)}")
-
-    def stop_streaming(self):
-        """Arrête le streaming MJPG"""
-        if self.streaming_process:
-            self.streaming_process.terminate()
-            self.streaming_active = False
+        Args:
+            future (Future): Écriture soumise à _PHOTO_WRITER
+            photo (Path): Fichier de destination
+        """
+        error = future.exception()
+        if error is None:
+            self.logger.info(f'Photo sauvegardée: {photo}')
+        else:
+            self.logger.error(f"Erreur d'écriture de la photo {photo}: {str(error)}")
 
     def start_streaming(self):
         """Démarre le streaming MJPG sur le port 8080"""
@@ -235,11 +244,12 @@ class CameraModule:
                 '-o', 'output_http.so -p 8080 -w /usr/local/share/mjpg-streamer/www'
             ]
             
+            # Lancement direct (sans /bin/sh) ; chaque argument -i/-o
+            # est transmis tel quel à mjpg_streamer
             self.streaming_process = subprocess.Popen(
-                ' '.join(cmd),
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             
             self.streaming_active = True
@@ -259,8 +269,3 @@ class CameraModule:
         if self.streaming_process:
             self.streaming_process.terminate()
             self.streaming_active = False
-
-    def start_object_detection(self):
-        """Détection d'objets optimisée"""
-        Vilib.object_detect_switch(True)
-        self.logger.info("Détection d'objets activée") 
\ No newline at end of file
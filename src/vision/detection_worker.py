@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module du Processus de Détection
+------------------------------
+Isole Vilib (caméra, affichage, détection de couleurs et de visages)
+dans un processus dédié, afin que l'encodage JPEG de l'affichage et
+les détections ne prennent pas de temps à la boucle de contrôle.
+
+Le processus de contrôle communique avec lui uniquement par mémoire partagée :
+- Commandes : file SPSC (contrôle → détection)
+- Résultats de détection : file SPSC (détection → contrôle)
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+from vilib import Vilib
+
+from ..utils.ipc import SPSCRing
+
+# Commande envoyée au processus de détection
+COMMAND_DTYPE = np.dtype([
+    ('op', 'u1'),
+    ('arg', 'i1')
+])
+
+# Résultats de détection publiés par le processus
+DETECTION_DTYPE = np.dtype([
+    ('color_n', 'i4'), ('color_x', 'i4'), ('color_y', 'i4'),
+    ('color_w', 'i4'), ('color_h', 'i4'),
+    ('human_n', 'i4'), ('human_x', 'i4'), ('human_y', 'i4'),
+    ('human_w', 'i4'), ('human_h', 'i4')
+])
+
+# Codes de commande
+CMD_COLOR = 1   # arg : index dans COLORS
+CMD_FACE = 2    # arg : 1 active, 0 désactive
+CMD_PHOTO = 3
+CMD_QUIT = 4
+
+COLORS = ['close', 'red', 'orange', 'yellow', 'green', 'blue', 'purple']
+
+
+class DetectionWorker:
+    """
+    Processus de détection basé sur Vilib.
+    Toutes les méthodes publiques sont appelées depuis le processus
+    de contrôle et ne bloquent pas.
+    """
+
+    def __init__(self, period=0.03):
+        """
+        Initialise les structures partagées (le processus n'est pas lancé).
+
+        Args:
+            period (float): Période de la boucle de détection en secondes
+        """
+        self.logger = logging.getLogger('PiCarX.DetectionWorker')
+        self.period = period
+        self.commands = SPSCRing(COMMAND_DTYPE)
+        self.results = SPSCRing(DETECTION_DTYPE)
+        self._last_detection = np.zeros((), dtype=DETECTION_DTYPE)
+        self._process = None
+
+    def start(self):
+        """Lance le processus de détection."""
+        self._process = mp.Process(target=self._run, daemon=True)
+        self._process.start()
+        self.logger.info("Processus de détection démarré")
+
+    def color_detect(self, index):
+        """
+        Sélectionne la couleur à détecter.
+
+        Args:
+            index (int): Index dans COLORS (0 désactive)
+        """
+        self.commands.push((CMD_COLOR, index))
+
+    def face_detect(self, active):
+        """
+        Active ou désactive la détection de visages.
+
+        Args:
+            active (bool): État souhaité
+        """
+        self.commands.push((CMD_FACE, int(active)))
+
+    def take_photo(self):
+        """Demande la prise d'une photo."""
+        self.commands.push((CMD_PHOTO, 0))
+
+    def latest_detection(self):
+        """
+        Retourne les derniers résultats de détection connus.
+
+        Returns:
+            np.void: Enregistrement DETECTION_DTYPE
+        """
+        record = self.results.pop_latest()
+        if record is not None:
+            self._last_detection = record
+        return self._last_detection
+
+    def stop(self, timeout=2.0):
+        """
+        Arrête le processus et libère la mémoire partagée.
+
+        Args:
+            timeout (float): Attente maximale de l'arrêt en secondes
+        """
+        if self._process is not None:
+            self.commands.push((CMD_QUIT, 0))
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        self.commands.close()
+        self.results.close()
+        self.logger.info("Processus de détection arrêté")
+
+    def _run(self):
+        """Boucle du processus de détection (propriétaire de Vilib)."""
+        Vilib.camera_start(vflip=False, hflip=False)
+        Vilib.display(local=True, web=True)
+        params = Vilib.detect_obj_parameter
+
+        try:
+            while True:
+                # Une erreur n'interrompt que l'itération en cours
+                try:
+                    # Traitement des commandes en attente
+                    command = self.commands.pop()
+                    while command is not None:
+                        if command['op'] == CMD_QUIT:
+                            return
+                        self._handle_command(command)
+                        command = self.commands.pop()
+
+                    # Publication des résultats de détection
+                    self.results.push((
+                        params['color_n'], params['color_x'], params['color_y'],
+                        params['color_w'], params['color_h'],
+                        params['human_n'], params['human_x'], params['human_y'],
+                        params['human_w'], params['human_h']
+                    ))
+                except Exception as e:
+                    self.logger.error(f"Erreur dans le processus de détection: {str(e)}")
+
+                time.sleep(self.period)
+        finally:
+            Vilib.camera_close()
+
+    def _handle_command(self, command):
+        """
+        Exécute une commande reçue du processus de contrôle.
+
+        Args:
+            command (np.void): Enregistrement COMMAND_DTYPE
+        """
+        op, arg = command['op'], int(command['arg'])
+        if op == CMD_COLOR:
+            Vilib.color_detect(COLORS[arg])
+        elif op == CMD_FACE:
+            Vilib.face_detect_switch(bool(arg))
+        elif op == CMD_PHOTO:
+            timestamp = time.strftime('%Y-%m-%d-%H-%M-%S', time.localtime())
+            name = f'photo_{timestamp}'
+            path = f"/home/{os.getlogin()}/Pictures/"
+            Vilib.take_photo(name, path)
+            print(f'Photo sauvegardée: {path}{name}.jpg')
@@ -15,6 +15,49 @@ Il fournit des informations sur :
 import cv2
 import numpy as np
 import logging
+from numba import njit
+
+# Prétraitement déporté sur le GPU (OpenCL via UMat) lorsque disponible ;
+# sans périphérique OpenCL, useOpenCL() reste faux et rien ne change
+cv2.ocl.setUseOpenCL(True)
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _centroid_angle(binary):
+    """
+    Centre de masse et pente des pixels de ligne, en une seule passe.
+
+    Args:
+        binary (np.array): Image binaire (non nul = ligne)
+
+    Returns:
+        tuple: (nombre de pixels, x moyen, y moyen, pente de la
+            régression x = a·y + b ; NaN si une seule rangée)
+    """
+    h, w = binary.shape
+    total = 0
+    sx = 0
+    sy = 0
+    sxy = 0
+    syy = 0
+    for y in range(h):
+        for x in range(w):
+            if binary[y, x]:
+                total += 1
+                sx += x
+                sy += y
+                sxy += x * y
+                syy += y * y
+    if total == 0:
+        return 0, 0.0, 0.0, np.nan
+
+    denom = total * syy - sy * sy
+    if denom == 0:
+        slope = np.nan
+    else:
+        slope = (total * sxy - sx * sy) / denom
+    return total, sx / total, sy / total, slope
+
 
 class LineDetector:
     """
@@ -23,16 +66,27 @@ class LineDetector:
     et analyser la ligne à suivre.
     """
 
-    def __init__(self, threshold=127):
+    def __init__(self, block_size=7, offset=5, scale=0.5, min_area_ratio=0.01):
         """
         Initialise le détecteur de ligne.
 
         Args:
-            threshold (int): Seuil de binarisation (0-255)
-                           Plus la valeur est haute, plus la détection
-                           sera sensible aux lignes claires.
+            block_size (int): Taille (impaire) du voisinage du seuillage
+                            adaptatif, à ajuster selon la résolution
+            offset (int): Écart sous la moyenne locale pour qu'un pixel
+                        soit considéré comme faisant partie de la ligne
+            scale (float): Facteur de réduction de la zone analysée
+                         (la position et l'angle y sont peu sensibles)
+            min_area_ratio (float): Surface minimale de la ligne, en
+                                  fraction de la zone analysée
         """
-        self.threshold = threshold
+        self.block_size = block_size
+        self.offset = offset
+        self.scale = scale
+        self.min_area_ratio = min_area_ratio
+        # Ouverture morphologique : supprime les pixels isolés (bruit,
+        # texture du sol) laissés par le seuillage adaptatif
+        self._open_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
         self.logger = logging.getLogger('PiCarX.LineDetector')
         self.logger.info("Initialisation du détecteur de ligne")
 
@@ -41,24 +95,29 @@ class LineDetector:
         Prétraite l'image pour faciliter la détection.
 
         Args:
-            frame (np.array): Image source en BGR
+            frame (np.array): Zone d'intérêt de l'image source en BGR
 
         Returns:
-            np.array: Image binaire prétraitée
+            np.array | cv2.UMat: Image binaire prétraitée
+                (UMat si OpenCL est actif)
         """
+        if cv2.ocl.useOpenCL():
+            frame = cv2.UMat(frame)
+        
         # Conversion en niveaux de gris
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
-        # Application d'un flou gaussien pour réduire le bruit
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        
-        # Binarisation de l'image
-        _, binary = cv2.threshold(
-            blurred,
-            self.threshold,
+        # Binarisation adaptative : seuil local par moyenne (image
+        # intégrale), robuste à l'éclairage et sans passe de flou séparée
+        binary = cv2.adaptiveThreshold(
+            gray,
             255,
-            cv2.THRESH_BINARY_INV
+            cv2.ADAPTIVE_THRESH_MEAN_C,
+            cv2.THRESH_BINARY_INV,
+            self.block_size,
+            self.offset
         )
+        binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, self._open_kernel)
         
         return binary
 
@@ -76,51 +135,58 @@ class LineDetector:
                 - angle (float): Angle de la ligne en degrés
         """
         try:
-            # Prétraitement optimisé
-            binary = self.preprocess_image(frame)
+            # ROI plus précise, extraite avant tout traitement
+            height = frame.shape[0]
+            roi_top = height - height // 3  # Réduit la zone d'analyse
+            roi_bgr = frame[roi_top:, :]
             
-            # ROI plus précise
-            height, width = binary.shape
-            roi_height = height // 3  # Réduit la zone d'analyse
-            roi = binary[height-roi_height:, :]
+            # Sous-échantillonnage de la ROI
+            if self.scale != 1:
+                roi_bgr = cv2.resize(
+                    roi_bgr, None, fx=self.scale, fy=self.scale,
+                    interpolation=cv2.INTER_AREA
+                )
             
-            # Détection des contours avec paramètres optimisés
-            contours, _ = cv2.findContours(
-                roi,
-                cv2.RETR_EXTERNAL,
-                cv2.CHAIN_APPROX_SIMPLE
-            )
+            # Prétraitement optimisé (ROI uniquement)
+            roi = self.preprocess_image(roi_bgr)
+            if isinstance(roi, cv2.UMat):
+                roi = roi.get()  # Rapatriement pour les calculs NumPy
+            roi_height, roi_width = roi.shape
             
-            if not contours:
+            # Ligne = plus grande composante connexe (le bruit restant
+            # ne déplace plus le centre de masse)
+            n_labels, labels, stats, _ = cv2.connectedComponentsWithStats(
+                roi, connectivity=8, ltype=cv2.CV_32S
+            )
+            if n_labels < 2:
                 return {'detected': False, 'position': None, 'angle': None}
+            best = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
             
-            # Filtrage des contours par taille
-            min_contour_area = 100  # Ajuster selon la résolution
-            valid_contours = [c for c in contours if cv2.contourArea(c) > min_contour_area]
-            
-            if not valid_contours:
+            # Surface minimale, proportionnelle à la zone analysée
+            if stats[best, cv2.CC_STAT_AREA] <= self.min_area_ratio * roi.size:
                 return {'detected': False, 'position': None, 'angle': None}
             
-            # Analyse du plus grand contour valide
-            largest_contour = max(valid_contours, key=cv2.contourArea)
-            M = cv2.moments(largest_contour)
-            
-            if M["m00"] == 0:
-                return {'detected': False, 'position': None, 'angle': None}
+            # Pixels de la composante, centre de masse et pente en une
+            # passe, limités à sa boîte englobante
+            x0, y0, w, h = stats[best, :4]
+            component = (labels[y0:y0 + h, x0:x0 + w] == best).view(np.uint8)
+            total, mean_x, mean_y, slope = _centroid_angle(component)
             
-            # Calcul optimisé du centre
-            cx = int(M["m10"] / M["m00"])
-            cy = int(M["m01"] / M["m00"]) + (height - roi_height)
+            # Centre de masse des pixels (coordonnées de l'image source)
+            cx = int((mean_x + x0) / self.scale)
+            cy = int((mean_y + y0) / self.scale) + roi_top
             
-            # Calcul de l'angle avec lissage
-            vx, vy, x, y = cv2.fitLine(largest_contour, cv2.DIST_L2, 0, 0.01, 0.01)
-            angle = np.arctan2(vy, vx) * 180 / np.pi
+            # Angle issu de la régression x = a·y + b
+            if np.isnan(slope):
+                angle = 0.0  # Une seule rangée : ligne horizontale
+            else:
+                angle = np.degrees(np.arctan2(1.0, slope))
             
             return {
                 'detected': True,
                 'position': (cx, cy),
                 'angle': angle,
-                'confidence': cv2.contourArea(largest_contour) / (roi_height * width)
+                'confidence': total / (roi_height * roi_width)
             }
             
         except Exception as e:
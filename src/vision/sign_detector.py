@@ -6,56 +6,110 @@ import logging
 import cv2
 import numpy as np
 
+# Quantification de la table HSV (décalages binaires par canal) :
+# H/2, S/4, V/4 -> table de 90 x 64 x 64 octets (~370 Ko)
+_H_SHIFT = 1
+_S_SHIFT = 2
+_V_SHIFT = 2
+
 class SignDetector:
     def __init__(self):
         """Initialise le détecteur de panneaux"""
         self.logger = logging.getLogger('PiCarX.SignDetector')
+        # Bornes HSV converties une seule fois en tableaux uint8
         self.colors = {
-            'red': ([0, 100, 100], [10, 255, 255]),
-            'blue': ([100, 100, 100], [130, 255, 255]),
-            'yellow': ([20, 100, 100], [30, 255, 255])
+            'red': (np.array([0, 100, 100], dtype=np.uint8),
+                    np.array([10, 255, 255], dtype=np.uint8)),
+            'blue': (np.array([100, 100, 100], dtype=np.uint8),
+                     np.array([130, 255, 255], dtype=np.uint8)),
+            'yellow': (np.array([20, 100, 100], dtype=np.uint8),
+                       np.array([30, 255, 255], dtype=np.uint8))
+        }
+
+        # Un bit par couleur dans la table de correspondance HSV
+        self.color_bits = {
+            name: 1 << i for i, name in enumerate(self.colors)
         }
+        self.color_lut = self._build_color_lut()
+
+    def _build_color_lut(self):
+        """
+        Construit la table HSV quantifiée -> bits de couleur.
+        Chaque case est testée sur sa valeur basse : la borne haute
+        d'une plage peut donc être dépassée d'au plus un pas de quantification.
+
+        Returns:
+            np.array: Table (H, S, V) de masques de couleur (uint8)
+        """
+        h = np.arange(180 >> _H_SHIFT) << _H_SHIFT
+        s = np.arange(256 >> _S_SHIFT) << _S_SHIFT
+        v = np.arange(256 >> _V_SHIFT) << _V_SHIFT
+
+        lut = np.zeros((h.size, s.size, v.size), dtype=np.uint8)
+        for color_name, (lower, upper) in self.colors.items():
+            in_h = (h >= lower[0]) & (h <= upper[0])
+            in_s = (s >= lower[1]) & (s <= upper[1])
+            in_v = (v >= lower[2]) & (v <= upper[2])
+            lut[np.ix_(in_h, in_s, in_v)] |= self.color_bits[color_name]
+        return lut
 
     def detect(self, frame):
         """
         Détecte les panneaux dans l'image
-        
+
         Args:
             frame: Image à analyser
-            
+
         Returns:
             list: Liste des panneaux détectés
         """
         try:
+            # Les panneaux n'apparaissent que dans la moitié haute de
+            # l'image : analyse limitée à cette zone (débute en y = 0,
+            # les positions restent donc celles de l'image source)
+            roi = frame[:frame.shape[0] // 2, :]
+            roi_area = roi.shape[0] * roi.shape[1]
+
             # Conversion en HSV
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            
+            hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+
+            # Classification de toutes les couleurs en une seule lecture
+            labels = self.color_lut[
+                hsv[:, :, 0] >> _H_SHIFT,
+                hsv[:, :, 1] >> _S_SHIFT,
+                hsv[:, :, 2] >> _V_SHIFT
+            ]
+
             detected_signs = []
-            for color_name, (lower, upper) in self.colors.items():
-                # Création du masque
-                mask = cv2.inRange(hsv, np.array(lower), np.array(upper))
-                
-                # Détection des contours
-                contours, _ = cv2.findContours(
-                    mask,
-                    cv2.RETR_EXTERNAL,
-                    cv2.CHAIN_APPROX_SIMPLE
+            for color_name, bit in self.color_bits.items():
+                # Création du masque (0/1, même taille d'élément que bool)
+                mask = ((labels & bit) != 0).view(np.uint8)
+
+                # Composantes connexes : boîte et surface de chaque
+                # région en un seul appel (étiquette 0 = fond ignorée)
+                _, _, stats, _ = cv2.connectedComponentsWithStats(
+                    mask, connectivity=8, ltype=cv2.CV_32S
                 )
-                
-                # Filtrage des contours
-                for contour in contours:
-                    area = cv2.contourArea(contour)
-                    if area > 100:  # Seuil minimal
-                        x, y, w, h = cv2.boundingRect(contour)
-                        detected_signs.append({
-                            'color': color_name,
-                            'position': (x + w//2, y + h//2),
-                            'size': (w, h),
-                            'confidence': area / (frame.shape[0] * frame.shape[1])
-                        })
-            
+                keep = stats[1:][stats[1:, cv2.CC_STAT_AREA] > 100]  # Seuil minimal
+                if not len(keep):
+                    continue
+
+                # Centres et confiances calculés pour toutes les régions
+                xs = keep[:, 0] + keep[:, 2] // 2
+                ys = keep[:, 1] + keep[:, 3] // 2
+                confidences = keep[:, cv2.CC_STAT_AREA] / roi_area
+                for x, y, (w, h), conf in zip(
+                        xs.tolist(), ys.tolist(),
+                        keep[:, 2:4].tolist(), confidences.tolist()):
+                    detected_signs.append({
+                        'color': color_name,
+                        'position': (x, y),
+                        'size': (w, h),
+                        'confidence': conf
+                    })
+
             return detected_signs
-            
+
         except Exception as e:
             self.logger.error(f"Erreur détection panneaux: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
\ No newline at end of file
@@ -1,33 +1,49 @@
 import cv2
+import numpy as np
 import time
 
+# Format attendu des images de la caméra
+EXPECTED_SHAPE = (480, 640, 3)
+# Indices encore essayés une fois une caméra trouvée
+PRIMARY_INDICES = (0, 10, 11)
+
 def test_camera():
     print("Test de la caméra...")
-    
+
     # Essai avec différents indices
-    for i in [0, 10, 11, 12, 13, 14, 15, 16, 18, 19, 20, 21, 22, 23, 31]:
+    indices = [0, 10, 11, 12, 13, 14, 15, 16, 18, 19, 20, 21, 22, 23, 31]
+    found = False
+    for i in indices:
+        if found and i not in PRIMARY_INDICES:
+            continue
+
         print(f"\nEssai avec la caméra {i}")
-        cap = cv2.VideoCapture(i)
-        
+        # Backend V4L2 imposé : pas de sondage des autres backends
+        cap = cv2.VideoCapture(i, cv2.CAP_V4L2)
+
         if not cap.isOpened():
             print(f"Caméra {i} non accessible")
             continue
-            
+
         print(f"Caméra {i} ouverte")
         print(f"Propriétés de la caméra {i}:")
         print(f"- Largeur: {cap.get(cv2.CAP_PROP_FRAME_WIDTH)}")
         print(f"- Hauteur: {cap.get(cv2.CAP_PROP_FRAME_HEIGHT)}")
-        
-        # Tentative de capture
+
+        # Tentative de capture, vérifiée en mémoire (pas d'écriture disque)
         ret, frame = cap.read()
         if ret:
-            print(f"Capture réussie avec la caméra {i}")
-            cv2.imwrite(f"test_camera_{i}.jpg", frame)
+            if frame.shape == EXPECTED_SHAPE and frame.dtype == np.uint8:
+                print(f"Capture réussie avec la caméra {i}")
+            else:
+                print(f"Capture inattendue avec la caméra {i}: "
+                      f"{frame.shape} {frame.dtype}")
+            found = True
         else:
             print(f"Échec de capture avec la caméra {i}")
-            
+
         cap.release()
-        time.sleep(1)
+        time.sleep(0.1)
 
 if __name__ == "__main__":
-    test_camera() 
\ No newline at end of file
+    test_camera()